@@ -1,21 +1,38 @@
 """
 Script to create architecture diagram for the Fitbit analysis project.
-Run this script to generate the architecture diagram PNG file.
+Run this script to generate the architecture diagram SVG file (and a PNG
+copy when cairosvg is installed).
 """
-import matplotlib
-matplotlib.use('Agg')  # Use non-interactive backend
-import matplotlib.pyplot as plt
-from matplotlib.patches import FancyBboxPatch, FancyArrowPatch
 import os
+from xml.sax.saxutils import escape
 
 # Ensure reports directory exists
 os.makedirs('reports', exist_ok=True)
 
-# Create figure
-fig, ax = plt.subplots(figsize=(14, 10))
-ax.set_xlim(0, 10)
-ax.set_ylim(0, 12)
-ax.axis('off')
+# Diagram coordinates span x in [0, 10] and y in [0, 12] (y pointing up)
+SCALE = 100
+WIDTH, HEIGHT = 10 * SCALE, 12 * SCALE
+
+
+def px(x, y):
+    """Convert diagram coordinates to SVG pixel coordinates."""
+    return x * SCALE, (12 - y) * SCALE
+
+
+def text_lines(x, y, text, font_size, line_height=1.2, **attrs):
+    """Render (possibly multi-line) text centred vertically on (x, y)."""
+    lines = text.split('\n')
+    extra = ' '.join(f'{key.replace("_", "-")}="{value}"' for key, value in attrs.items())
+    first_dy = -(len(lines) - 1) / 2 * line_height
+    tspans = ''.join(
+        f'<tspan x="{x:.1f}" dy="{(first_dy if i == 0 else line_height):.2f}em">{escape(line)}</tspan>'
+        for i, line in enumerate(lines)
+    )
+    return (
+        f'<text x="{x:.1f}" y="{y:.1f}" font-size="{font_size}" text-anchor="middle" '
+        f'dominant-baseline="central" {extra}>{tspans}</text>'
+    )
+
 
 # Define colors
 colors = {
@@ -31,94 +48,116 @@ boxes = [
     {'text': 'Activity Data\n(activity.csv)', 'xy': (2, 9), 'width': 1.5, 'height': 1, 'color': colors['data']},
     {'text': 'Sleep Data\n(sleep.csv)', 'xy': (4, 9), 'width': 1.5, 'height': 1, 'color': colors['data']},
     {'text': 'Heart Rate Data\n(heart_rate.csv)', 'xy': (6.5, 9), 'width': 1.5, 'height': 1, 'color': colors['data']},
-    
+
     # Preprocessing layer
     {'text': 'Data\nPreprocessing\n(preprocess.py)', 'xy': (3.5, 6.5), 'width': 2.5, 'height': 1.5, 'color': colors['process']},
-    
+
     # Feature Engineering layer
     {'text': 'Feature\nEngineering\n(feature_engineering.py)', 'xy': (3.5, 4), 'width': 2.5, 'height': 1.5, 'color': colors['process']},
-    
+
     # Analysis layer
     {'text': 'Clustering\n(clustering.py)', 'xy': (1, 1.5), 'width': 2, 'height': 1.5, 'color': colors['analysis']},
     {'text': 'Visualization\n(visualization.py)', 'xy': (4, 1.5), 'width': 2, 'height': 1.5, 'color': colors['analysis']},
-    
+
     # Output layer
     {'text': 'Reports\n& Insights', 'xy': (7, 1.5), 'width': 2, 'height': 1.5, 'color': colors['output']},
 ]
 
-# Draw boxes
-for box in boxes:
-    fancy_box = FancyBboxPatch(
-        box['xy'], box['width'], box['height'],
-        boxstyle='round,pad=0.1',
-        edgecolor='black',
-        facecolor=box['color'],
-        linewidth=1.5
-    )
-    ax.add_patch(fancy_box)
-    
-    # Add text
-    ax.text(
-        box['xy'][0] + box['width']/2,
-        box['xy'][1] + box['height']/2,
-        box['text'],
-        ha='center',
-        va='center',
-        fontsize=9,
-        fontweight='bold'
-    )
-
 # Draw arrows (data flow)
 arrow_patches = [
     # Data to preprocessing
     ((2.75, 9), (4.25, 8), ''),
     ((4.75, 9), (4.75, 8), ''),
     ((7.25, 9), (5.25, 8), ''),
-    
+
     # Preprocessing to feature engineering
     ((4.75, 6.5), (4.75, 5.5), 'Merged Data'),
-    
+
     # Feature engineering to analysis
     ((3.5, 4), (2, 2.25), 'User Features'),
     ((5.5, 4), (6, 2.25), 'Daily Features'),
-    
+
     # Analysis to output
     ((3, 1.5), (7, 2.25), 'Results'),
 ]
 
-for arrow_info in arrow_patches:
-    start, end, label = arrow_info
-    arrow_patch = FancyArrowPatch(
-        start, end,
-        arrowstyle='->',
-        mutation_scale=20,
-        linewidth=2,
-        color='#333333'
+# Layer labels (rotated along the left edge)
+layer_labels = [
+    ('DATA', 9.5),
+    ('PREPROCESSING', 7.25),
+    ('FEATURE\nENGINEERING', 4.75),
+    ('ANALYSIS\n& OUTPUT', 2.25),
+]
+
+elements = [
+    f'<svg xmlns="http://www.w3.org/2000/svg" width="{WIDTH}" height="{HEIGHT}" '
+    f'viewBox="0 0 {WIDTH} {HEIGHT}" font-family="DejaVu Sans, Arial, sans-serif">',
+    '<defs><marker id="arrow" viewBox="0 0 10 10" refX="9" refY="5" markerWidth="8" '
+    'markerHeight="8" orient="auto-start-reverse"><path d="M 0 0 L 10 5 L 0 10" fill="none" '
+    'stroke="#333333" stroke-width="1.5"/></marker></defs>',
+    f'<rect width="{WIDTH}" height="{HEIGHT}" fill="white"/>',
+]
+
+# Draw boxes (rounded, padded like a round,pad=0.1 box)
+pad = 0.1 * SCALE
+for box in boxes:
+    x, y = px(box['xy'][0], box['xy'][1] + box['height'])
+    w, h = box['width'] * SCALE, box['height'] * SCALE
+    elements.append(
+        f'<rect x="{x - pad:.1f}" y="{y - pad:.1f}" width="{w + 2 * pad:.1f}" height="{h + 2 * pad:.1f}" '
+        f'rx="{pad:.1f}" fill="{box["color"]}" stroke="black" stroke-width="1.5"/>'
     )
-    ax.add_patch(arrow_patch)
-    
+    elements.append(text_lines(x + w / 2, y + h / 2, box['text'], 15, font_weight='bold'))
+
+for start, end, label in arrow_patches:
+    (x1, y1), (x2, y2) = px(*start), px(*end)
+    elements.append(
+        f'<path d="M {x1:.1f} {y1:.1f} L {x2:.1f} {y2:.1f}" stroke="#333333" '
+        f'stroke-width="2.5" marker-end="url(#arrow)"/>'
+    )
+
     if label:
-        mid_x = (start[0] + end[0]) / 2
-        mid_y = (start[1] + end[1]) / 2
-        ax.text(mid_x, mid_y + 0.15, label, ha='center', fontsize=8, 
-                bbox=dict(boxstyle='round,pad=0.3', facecolor='white', alpha=0.9, edgecolor='none'))
+        mid_x = (x1 + x2) / 2
+        mid_y = (y1 + y2) / 2 - 0.15 * SCALE
+        label_width = 8 * len(label) + 16
+        elements.append(
+            f'<rect x="{mid_x - label_width / 2:.1f}" y="{mid_y - 12:.1f}" width="{label_width}" '
+            f'height="24" rx="6" fill="white" fill-opacity="0.9"/>'
+        )
+        elements.append(text_lines(mid_x, mid_y, label, 13))
 
 # Add title
-ax.text(5, 11.5, 'Fitbit Health Tracker Data Analysis - Architecture', 
-        ha='center', fontsize=16, fontweight='bold')
+title_x, title_y = px(5, 11.5)
+elements.append(text_lines(
+    title_x, title_y, 'Fitbit Health Tracker Data Analysis - Architecture', 26, font_weight='bold'
+))
 
 # Add layer labels
-ax.text(0.3, 9.5, 'DATA', ha='center', fontsize=11, fontweight='bold', 
-        rotation=90, bbox=dict(boxstyle='round', facecolor='white', alpha=0.9, edgecolor='black'))
-ax.text(0.3, 7.25, 'PREPROCESSING', ha='center', fontsize=11, fontweight='bold', 
-        rotation=90, bbox=dict(boxstyle='round', facecolor='white', alpha=0.9, edgecolor='black'))
-ax.text(0.3, 4.75, 'FEATURE\nENGINEERING', ha='center', fontsize=11, fontweight='bold', 
-        rotation=90, bbox=dict(boxstyle='round', facecolor='white', alpha=0.9, edgecolor='black'))
-ax.text(0.3, 2.25, 'ANALYSIS\n& OUTPUT', ha='center', fontsize=11, fontweight='bold', 
-        rotation=90, bbox=dict(boxstyle='round', facecolor='white', alpha=0.9, edgecolor='black'))
-
-plt.tight_layout()
-plt.savefig('reports/architecture_diagram.png', dpi=300, bbox_inches='tight', facecolor='white')
-print("✅ Architecture diagram saved to reports/architecture_diagram.png")
-plt.close()
+for label, y in layer_labels:
+    x, y = px(0.3, y)
+    n_lines = label.count('\n') + 1
+    longest = max(len(line) for line in label.split('\n'))
+    box_w, box_h = 12 * longest + 24, 22 * n_lines + 12
+    elements.append(
+        f'<g transform="rotate(-90 {x:.1f} {y:.1f})">'
+        f'<rect x="{x - box_w / 2:.1f}" y="{y - box_h / 2:.1f}" width="{box_w}" height="{box_h}" '
+        f'rx="8" fill="white" fill-opacity="0.9" stroke="black"/>'
+        f'{text_lines(x, y, label, 18, font_weight="bold")}</g>'
+    )
+
+elements.append('</svg>')
+
+svg_path = 'reports/architecture_diagram.svg'
+with open(svg_path, 'w') as f:
+    f.write('\n'.join(elements))
+print(f"✅ Architecture diagram saved to {svg_path}")
+
+# Rasterize once to PNG if cairosvg is available
+try:
+    import cairosvg
+except (ImportError, OSError):  # OSError: cairosvg installed without libcairo
+    cairosvg = None
 
+if cairosvg is not None:
+    cairosvg.svg2png(url=svg_path, write_to='reports/architecture_diagram.png', output_width=3000)
+    print("✅ Architecture diagram saved to reports/architecture_diagram.png")
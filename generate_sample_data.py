@@ -1,12 +1,12 @@
 """
 Script to generate sample Fitbit data for 33 users over 30 days.
-Run this script to populate the data/ directory with sample CSV files.
+Run this script to populate the data/ directory with sample Parquet files.
 """
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 
-np.random.seed(42)
+rng = np.random.default_rng(42)
 
 # Generate date range (30 days)
 start_date = datetime(2024, 1, 1)
@@ -15,78 +15,87 @@ dates = [(start_date + timedelta(days=i)).strftime('%Y-%m-%d') for i in range(30
 # Generate user IDs (33 users)
 users = [f'user_{i:02d}' for i in range(1, 34)]
 
+n_users, n_days = len(users), len(dates)
+shape = (n_users, n_days)
+
+# One row per (user, date), user-major
+user_col = np.repeat(users, n_days)
+date_col = np.tile(dates, n_users)
+
+
+def draw_int(loc, scale, lower):
+    """Draw a (users x days) block of normal values truncated to ints >= lower."""
+    return np.maximum(lower, rng.normal(loc, scale, size=shape)).astype(np.int32).ravel()
+
+
+def save_dataset(df, name):
+    """Write a dataset to data/<name>.parquet with compact, typed columns."""
+    df = df.astype({
+        'user_id': 'category',
+        **{col: np.int32 for col in df.select_dtypes('int64').columns},
+        **{col: np.float32 for col in df.select_dtypes('float64').columns}
+    })
+    df['date'] = pd.to_datetime(df['date'], format='%Y-%m-%d')
+    df.to_parquet(f'data/{name}.parquet', engine='pyarrow', compression='zstd', index=False)
+    print(f"Created {name}.parquet with {len(df)} rows")
+
+
 # 1. Activity Data
-print("Generating activity.csv...")
-activity_data = []
-for user in users:
-    # Different activity patterns per user
-    base_steps = np.random.uniform(5000, 12000)
-    base_calories = np.random.uniform(1800, 2600)
-    
-    for date in dates:
-        activity_data.append({
-            'user_id': user,
-            'date': date,
-            'steps': max(0, int(np.random.normal(base_steps, base_steps * 0.3))),
-            'calories_burned': max(0, int(np.random.normal(base_calories, base_calories * 0.2))),
-            'sedentary_minutes': max(0, int(np.random.normal(600, 120))),
-            'lightly_active_minutes': max(0, int(np.random.normal(200, 50))),
-            'moderately_active_minutes': max(0, int(np.random.normal(30, 15))),
-            'very_active_minutes': max(0, int(np.random.normal(20, 10)))
-        })
-
-activity_df = pd.DataFrame(activity_data)
-activity_df.to_csv('data/activity.csv', index=False)
-print(f"Created activity.csv with {len(activity_df)} rows")
+print("Generating activity.parquet...")
+# Different activity patterns per user
+base_steps = rng.uniform(5000, 12000, size=n_users)[:, None]
+base_calories = rng.uniform(1800, 2600, size=n_users)[:, None]
+
+activity_df = pd.DataFrame({
+    'user_id': user_col,
+    'date': date_col,
+    'steps': draw_int(base_steps, base_steps * 0.3, 0),
+    'calories_burned': draw_int(base_calories, base_calories * 0.2, 0),
+    'sedentary_minutes': draw_int(600, 120, 0),
+    'lightly_active_minutes': draw_int(200, 50, 0),
+    'moderately_active_minutes': draw_int(30, 15, 0),
+    'very_active_minutes': draw_int(20, 10, 0)
+})
+save_dataset(activity_df, 'activity')
 
 # 2. Sleep Data
-print("Generating sleep.csv...")
-sleep_data = []
-for user in users:
-    base_sleep_hours = np.random.uniform(6, 9)
-    
-    for date in dates:
-        # Sleep duration in minutes
-        sleep_duration = max(300, int(np.random.normal(base_sleep_hours * 60, 60)))
-        time_in_bed = sleep_duration + np.random.randint(10, 60)
-        
-        sleep_data.append({
-            'user_id': user,
-            'date': date,
-            'time_in_bed_minutes': time_in_bed,
-            'sleep_duration_minutes': sleep_duration,
-            'sleep_efficiency': round(np.random.uniform(0.75, 0.95), 3),
-            'deep_sleep_minutes': max(0, int(np.random.normal(90, 30))),
-            'rem_sleep_minutes': max(0, int(np.random.normal(120, 40))),
-            'light_sleep_minutes': sleep_duration - (int(np.random.normal(90, 30)) + int(np.random.normal(120, 40)))
-        })
-
-sleep_df = pd.DataFrame(sleep_data)
+print("Generating sleep.parquet...")
+base_sleep_hours = rng.uniform(6, 9, size=n_users)[:, None]
+
+# Sleep duration in minutes
+sleep_duration = draw_int(base_sleep_hours * 60, 60, 300)
+time_in_bed = sleep_duration + rng.integers(10, 60, size=n_users * n_days)
+
+sleep_df = pd.DataFrame({
+    'user_id': user_col,
+    'date': date_col,
+    'time_in_bed_minutes': time_in_bed,
+    'sleep_duration_minutes': sleep_duration,
+    'sleep_efficiency': rng.integers(750, 951, size=n_users * n_days) / 1000.0,
+    'deep_sleep_minutes': draw_int(90, 30, 0),
+    'rem_sleep_minutes': draw_int(120, 40, 0),
+    'light_sleep_minutes': sleep_duration - (
+        rng.normal(90, 30, size=n_users * n_days).astype(np.int32) +
+        rng.normal(120, 40, size=n_users * n_days).astype(np.int32)
+    )
+})
 sleep_df['light_sleep_minutes'] = sleep_df['light_sleep_minutes'].clip(lower=0)
-sleep_df.to_csv('data/sleep.csv', index=False)
-print(f"Created sleep.csv with {len(sleep_df)} rows")
+save_dataset(sleep_df, 'sleep')
 
 # 3. Heart Rate Data
-print("Generating heart_rate.csv...")
-heart_rate_data = []
-for user in users:
-    base_resting_hr = np.random.uniform(55, 75)
-    
-    for date in dates:
-        heart_rate_data.append({
-            'user_id': user,
-            'date': date,
-            'avg_resting_hr': max(40, int(np.random.normal(base_resting_hr, 5))),
-            'avg_hr': max(50, int(np.random.normal(base_resting_hr + 10, 8))),
-            'max_hr': max(70, int(np.random.normal(base_resting_hr + 40, 15))),
-            'min_hr': max(40, int(np.random.normal(base_resting_hr - 5, 5))),
-            'calories_burned_hr': max(0, int(np.random.normal(2200, 400)))
-        })
-
-hr_df = pd.DataFrame(heart_rate_data)
-hr_df.to_csv('data/heart_rate.csv', index=False)
-print(f"Created heart_rate.csv with {len(hr_df)} rows")
+print("Generating heart_rate.parquet...")
+base_resting_hr = rng.uniform(55, 75, size=n_users)[:, None]
+
+hr_df = pd.DataFrame({
+    'user_id': user_col,
+    'date': date_col,
+    'avg_resting_hr': draw_int(base_resting_hr, 5, 40),
+    'avg_hr': draw_int(base_resting_hr + 10, 8, 50),
+    'max_hr': draw_int(base_resting_hr + 40, 15, 70),
+    'min_hr': draw_int(base_resting_hr - 5, 5, 40),
+    'calories_burned_hr': draw_int(2200, 400, 0)
+})
+save_dataset(hr_df, 'heart_rate')
 
 print("\n✅ All sample data files generated successfully!")
 print(f"Total records: {len(activity_df)} activity, {len(sleep_df)} sleep, {len(hr_df)} heart rate")
-
@@ -9,30 +9,98 @@ This script runs the complete analysis pipeline:
 """
 
 import sys
+import hashlib
 from pathlib import Path
 
+import pandas as pd
+
 # Add src to path
 sys.path.append(str(Path(__file__).parent))
 
-from src.preprocess import preprocess_pipeline
+from src.preprocess import preprocess_pipeline, dataset_path, DATASET_COLUMNS
 from src.feature_engineering import feature_engineering_pipeline
 from src.clustering import clustering_pipeline
 from src.visualization import create_all_visualizations
 
-def main():
-    """Run the complete analysis pipeline."""
-    print("=" * 60)
-    print("FITBIT HEALTH TRACKER DATA ANALYSIS - MAIN PIPELINE")
-    print("=" * 60)
+CACHE_DIR = Path('reports/.cache')
+
+
+def feature_cache_key(data_dir='data'):
+    """
+    Compute a cache key for the engineered features.
+    
+    The key covers each input file's path, size, modification time and
+    first 4 KB, plus the modules that produce the features (including the
+    lifestyle kernel source and any compiled build of it). BLAKE2b is used
+    for speed; this is not a security check.
+    
+    Args:
+        data_dir (str): Directory containing data files
+        
+    Returns:
+        str: 16-character hex key
+    """
+    src_dir = Path(__file__).parent / 'src'
+    input_files = [dataset_path(data_dir, name) for name in DATASET_COLUMNS] + [
+        src_dir / 'preprocess.py',
+        src_dir / 'feature_engineering.py',
+        *sorted(src_dir.glob('_kernels*'))  # _kernels.py and a Pythran .so/.pyd
+    ]
+    
+    digest = hashlib.blake2b()
+    for path in input_files:
+        stat = path.stat()
+        digest.update(f'{path}:{stat.st_size}:{stat.st_mtime_ns}'.encode())
+        with open(path, 'rb') as f:
+            digest.update(f.read(4096))
+    return digest.hexdigest()[:16]
+
+
+def load_or_build_features(data_dir='data'):
+    """
+    Load engineered features from the cache, or run steps 1-2 and cache them.
+    
+    Args:
+        data_dir (str): Directory containing data files
+        
+    Returns:
+        tuple: (daily_features_df, user_features_df)
+    """
+    key = feature_cache_key(data_dir)
+    cache_path = CACHE_DIR / key
+    
+    if (cache_path / 'key.txt').exists():
+        print(f"\n[STEP 1-2/4] Inputs unchanged, loading cached features from {cache_path}")
+        daily_features = pd.read_parquet(cache_path / 'daily_features.parquet')
+        user_features = pd.read_parquet(cache_path / 'user_features.parquet')
+        return daily_features, user_features
     
     # Step 1: Preprocessing
     print("\n[STEP 1/4] Preprocessing data...")
-    df = preprocess_pipeline(data_dir='data')
+    df = preprocess_pipeline(data_dir=data_dir)
     
     # Step 2: Feature Engineering
     print("\n[STEP 2/4] Engineering features...")
     daily_features, user_features = feature_engineering_pipeline(df)
     
+    # Cache both frames; key.txt is written last and marks a complete entry
+    cache_path.mkdir(parents=True, exist_ok=True)
+    daily_features.to_parquet(cache_path / 'daily_features.parquet', index=False)
+    user_features.to_parquet(cache_path / 'user_features.parquet', index=False)
+    (cache_path / 'key.txt').write_text(key)
+    
+    return daily_features, user_features
+
+
+def main():
+    """Run the complete analysis pipeline."""
+    print("=" * 60)
+    print("FITBIT HEALTH TRACKER DATA ANALYSIS - MAIN PIPELINE")
+    print("=" * 60)
+    
+    # Steps 1-2: Preprocessing and Feature Engineering (cached)
+    daily_features, user_features = load_or_build_features(data_dir='data')
+    
     # Step 3: Clustering
     print("\n[STEP 3/4] Performing clustering...")
     user_features_clustered, profiles, kmeans, scaler, X_scaled, feature_names = clustering_pipeline(
@@ -7,6 +7,13 @@ clustering, and visualization of Fitbit health tracker data.
 
 __version__ = '1.0.0'
 
+import pandas as pd
+
+# Let pandas share data between frames until one is modified
+# (always enabled from pandas 3.0, where the option is deprecated)
+if int(pd.__version__.split('.')[0]) < 3:
+    pd.set_option('mode.copy_on_write', True)
+
 from . import preprocess
 from . import feature_engineering
 from . import clustering
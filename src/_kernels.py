@@ -0,0 +1,48 @@
+"""
+Numeric Kernels Module
+
+Per-row kernels used by feature engineering. This module is plain Python
+so it can be JIT-compiled with numba, or compiled ahead of time with
+Pythran (the compiled extension then takes precedence on import):
+
+    pythran -O3 -fopenmp -march=native src/_kernels.py -o src/_kernels.so
+"""
+
+import numpy as np
+
+
+#pythran export lifestyle_kernel(float64[], float64[], float64[], float64[], float64[], float64[])
+def lifestyle_kernel(steps, sleep_eff, high_intensity, resting_hr, weights, out):
+    """
+    Fused per-row lifestyle score; missing (NaN) components count as 0.
+    
+    Args:
+        steps, sleep_eff, high_intensity, resting_hr (np.array): Daily metrics
+        weights (np.array): Component weights (0 for unavailable columns)
+        out (np.array): Output array, written in place
+    """
+    #omp parallel for
+    for i in range(out.shape[0]):
+        total = 0.0
+        
+        # Steps component (10k steps = 1.0, capped at 2.0)
+        s = min(max(steps[i] / 10000.0, 0.0), 2.0)
+        if not np.isnan(s):
+            total += weights[0] * s
+        
+        # Sleep component (0-2 scale)
+        sl = sleep_eff[i] * 2.0
+        if not np.isnan(sl):
+            total += weights[1] * sl
+        
+        # Activity component (60 min = 1.0, capped at 2.0)
+        a = min(max(high_intensity[i] / 60.0, 0.0), 2.0)
+        if not np.isnan(a):
+            total += weights[2] * a
+        
+        # Heart rate component (resting HR 55-75 -> 1.0-0.0, lower is better)
+        h = min(max((75.0 - resting_hr[i]) / 20.0, 0.0), 1.0)
+        if not np.isnan(h):
+            total += weights[3] * h
+        
+        out[i] = total
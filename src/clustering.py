@@ -6,13 +6,25 @@ This module performs KMeans clustering on user features.
 
 import pandas as pd
 import numpy as np
-from sklearn.cluster import KMeans
-from sklearn.preprocessing import StandardScaler
+from collections import namedtuple
+from sklearn.cluster import KMeans, MiniBatchKMeans
 from sklearn.decomposition import PCA
 import warnings
 warnings.filterwarnings('ignore')
 
 
+class Scaler(namedtuple('Scaler', ['mean', 'std'])):
+    """Per-feature mean and standard deviation used to standardize features."""
+    
+    __slots__ = ()
+    
+    def transform(self, X):
+        """Standardize a feature matrix with the stored statistics."""
+        X_scaled = np.subtract(X, self.mean, dtype=np.float32)
+        np.divide(X_scaled, self.std, out=X_scaled)
+        return X_scaled
+
+
 def select_features_for_clustering(user_features_df):
     """
     Select and prepare features for clustering.
@@ -48,7 +60,9 @@ def select_features_for_clustering(user_features_df):
 
 def scale_features(X):
     """
-    Scale features using StandardScaler.
+    Standardize features to zero mean and unit variance.
+    
+    Constant features are left centred (their scale is treated as 1).
     
     Args:
         X (np.array): Feature matrix
@@ -56,24 +70,46 @@ def scale_features(X):
     Returns:
         tuple: (scaled_X, scaler)
     """
-    scaler = StandardScaler()
-    X_scaled = scaler.fit_transform(X)
+    mean = X.mean(axis=0)
+    std = X.std(axis=0)
+    std[std == 0] = 1.0
+    
+    scaler = Scaler(mean, std)
+    X_scaled = scaler.transform(X)
     return X_scaled, scaler
 
 
-def perform_kmeans_clustering(X_scaled, n_clusters=3, random_state=42):
+def perform_kmeans_clustering(X_scaled, n_clusters=3, random_state=42, use_minibatch=False):
     """
     Perform KMeans clustering.
     
+    KMeans keeps the best of 10 k-means++ initialisations so the
+    segmentation does not depend on the seed; MiniBatchKMeans can be used
+    for much larger inputs.
+    
     Args:
         X_scaled (np.array): Scaled feature matrix
         n_clusters (int): Number of clusters
         random_state (int): Random state for reproducibility
+        use_minibatch (bool): Use MiniBatchKMeans instead of KMeans
         
     Returns:
         tuple: (kmeans_model, cluster_labels)
     """
-    kmeans = KMeans(n_clusters=n_clusters, random_state=random_state, n_init=10)
+    if use_minibatch:
+        kmeans = MiniBatchKMeans(
+            n_clusters=n_clusters,
+            random_state=random_state,
+            batch_size=256,
+            n_init=3
+        )
+    else:
+        kmeans = KMeans(
+            n_clusters=n_clusters,
+            init='k-means++',
+            random_state=random_state,
+            n_init=10
+        )
     cluster_labels = kmeans.fit_predict(X_scaled)
     
     return kmeans, cluster_labels
@@ -92,33 +128,23 @@ def analyze_cluster_profiles(user_features_df, cluster_labels, feature_names):
         pd.DataFrame: Cluster profile summary
     """
     # Add cluster labels to dataframe
-    user_features_df = user_features_df.copy()
-    user_features_df['cluster'] = cluster_labels
-    
-    # Calculate cluster statistics
-    cluster_profiles = []
-    
-    for cluster_id in sorted(user_features_df['cluster'].unique()):
-        cluster_data = user_features_df[user_features_df['cluster'] == cluster_id]
-        
-        profile = {
-            'cluster': cluster_id,
-            'n_users': len(cluster_data)
-        }
-        
-        # Add mean values for each feature
-        for feature in feature_names:
-            if feature in cluster_data.columns:
-                profile[f'avg_{feature}'] = cluster_data[feature].mean()
-        
-        cluster_profiles.append(profile)
-    
-    profile_df = pd.DataFrame(cluster_profiles)
+    user_features_df = user_features_df.assign(cluster=cluster_labels)
+    
+    # Calculate cluster statistics in a single grouped pass
+    features = [feature for feature in feature_names if feature in user_features_df.columns]
+    grouped = user_features_df.groupby('cluster', sort=True)
+    profile_df = pd.concat(
+        [
+            grouped.size().rename('n_users'),
+            grouped[features].mean().add_prefix('avg_')
+        ],
+        axis=1
+    ).reset_index()
     
     return user_features_df, profile_df
 
 
-def clustering_pipeline(user_features_df, n_clusters=3, random_state=42):
+def clustering_pipeline(user_features_df, n_clusters=3, random_state=42, use_minibatch=False):
     """
     Complete clustering pipeline.
     
@@ -126,6 +152,7 @@ def clustering_pipeline(user_features_df, n_clusters=3, random_state=42):
         user_features_df (pd.DataFrame): User-level features
         n_clusters (int): Number of clusters
         random_state (int): Random state
+        use_minibatch (bool): Use MiniBatchKMeans instead of KMeans
         
     Returns:
         tuple: (user_features_with_clusters, cluster_profiles, kmeans_model, scaler, X_scaled)
@@ -140,19 +167,20 @@ def clustering_pipeline(user_features_df, n_clusters=3, random_state=42):
     
     # Scale features
     X_scaled, scaler = scale_features(X)
-    print("Features scaled using StandardScaler")
+    print("Features standardized to zero mean and unit variance")
     
     # Perform clustering
     kmeans, cluster_labels = perform_kmeans_clustering(
         X_scaled, 
         n_clusters=n_clusters, 
-        random_state=random_state
+        random_state=random_state,
+        use_minibatch=use_minibatch
     )
     print(f"KMeans clustering completed with {n_clusters} clusters")
     
     # Analyze clusters
     user_features_with_clusters, cluster_profiles = analyze_cluster_profiles(
-        user_features_df.copy(),
+        user_features_df,
         cluster_labels,
         feature_names
     )
@@ -7,83 +7,118 @@ This module creates derived features for clustering and analysis.
 import pandas as pd
 import numpy as np
 
+try:
+    from . import _kernels
+except ImportError:  # running this file as a script
+    import _kernels
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Daily columns feeding the lifestyle score and their weights
+LIFESTYLE_WEIGHTS = {
+    'steps': 0.3,
+    'sleep_efficiency': 0.25,
+    'high_intensity_minutes': 0.25,
+    'avg_resting_hr': 0.2
+}
+
+# Daily columns averaged per user, and the resulting feature names
+USER_FEATURE_COLUMNS = {
+    'steps': 'avg_steps',
+    'sedentary_minutes': 'avg_sedentary_minutes',
+    'calories_burned': 'avg_calories_burned',
+    'sleep_efficiency': 'avg_sleep_efficiency',
+    'time_in_bed_minutes': 'avg_time_in_bed',
+    'avg_resting_hr': 'avg_resting_hr',
+    'high_intensity_minutes': 'avg_high_intensity_minutes',
+    'lifestyle_score': 'avg_lifestyle_score'
+}
+
+
+def _lifestyle_numpy(steps, sleep_eff, high_intensity, resting_hr, weights, out):
+    """NumPy equivalent of _kernels.lifestyle_kernel."""
+    components = [
+        np.clip(steps / 10000, 0, 2),
+        sleep_eff * 2,
+        np.clip(high_intensity / 60, 0, 2),
+        np.clip((75 - resting_hr) / 20, 0, 1)
+    ]
+    out[:] = sum(
+        weight * np.nan_to_num(component, nan=0.0)
+        for weight, component in zip(weights, components)
+    )
 
-def calculate_sleep_efficiency(df):
-    """
-    Calculate sleep efficiency if not already present.
-    
-    Args:
-        df (pd.DataFrame): Input dataframe
-        
-    Returns:
-        pd.DataFrame: DataFrame with sleep_efficiency feature
-    """
-    if 'sleep_efficiency' not in df.columns:
-        if 'sleep_duration_minutes' in df.columns and 'time_in_bed_minutes' in df.columns:
-            df['sleep_efficiency'] = (
-                df['sleep_duration_minutes'] / df['time_in_bed_minutes']
-            ).fillna(0)
-            df['sleep_efficiency'] = df['sleep_efficiency'].clip(0, 1)
-    return df
 
-
-def calculate_high_intensity_minutes(df):
-    """
-    Calculate high intensity activity minutes.
-    
-    Args:
-        df (pd.DataFrame): Input dataframe
-        
-    Returns:
-        pd.DataFrame: DataFrame with high_intensity_minutes feature
-    """
-    if 'very_active_minutes' in df.columns and 'moderately_active_minutes' in df.columns:
-        df['high_intensity_minutes'] = (
-            df['very_active_minutes'] + 
-            df['moderately_active_minutes'] * 0.5
-        )
-    return df
+# Pick the fastest available lifestyle kernel: an ahead-of-time Pythran
+# build of _kernels, then numba JIT, then plain NumPy
+if not _kernels.__file__.endswith('.py'):
+    _lifestyle_kernel = _kernels.lifestyle_kernel
+elif NUMBA_AVAILABLE:
+    _lifestyle_kernel = njit(cache=True)(_kernels.lifestyle_kernel)
+else:
+    _lifestyle_kernel = _lifestyle_numpy
 
 
-def calculate_lifestyle_score(df):
+def compute_daily_derived(df):
     """
-    Calculate a composite lifestyle score based on multiple metrics.
+    Compute sleep_efficiency, high_intensity_minutes and lifestyle_score
+    in a single pass over the source columns.
+    
+    sleep_efficiency is only derived if not already present, and
+    high_intensity_minutes only if both activity columns exist.
     
     Args:
         df (pd.DataFrame): Input dataframe
         
     Returns:
-        pd.DataFrame: DataFrame with lifestyle_score feature
+        pd.DataFrame: DataFrame with derived daily features
     """
-    score_components = []
-    
-    # Steps component (normalized)
-    if 'steps' in df.columns:
-        steps_score = (df['steps'] / 10000).clip(0, 2)  # 10k steps = 1.0
-        score_components.append(steps_score * 0.3)
-    
-    # Sleep component (normalized)
-    if 'sleep_efficiency' in df.columns:
-        sleep_score = df['sleep_efficiency'] * 2  # 0-2 scale
-        score_components.append(sleep_score * 0.25)
-    
-    # Activity component
-    if 'high_intensity_minutes' in df.columns:
-        activity_score = (df['high_intensity_minutes'] / 60).clip(0, 2)
-        score_components.append(activity_score * 0.25)
-    
-    # Heart rate component (resting HR - lower is better, normalized)
-    if 'avg_resting_hr' in df.columns:
-        hr_score = (75 - df['avg_resting_hr']) / 20  # 55-75 range -> 1.0-0.0
-        hr_score = hr_score.clip(0, 1)
-        score_components.append(hr_score * 0.2)
-    
-    # Calculate weighted sum
-    if score_components:
-        df['lifestyle_score'] = pd.concat(score_components, axis=1).sum(axis=1)
-        df['lifestyle_score'] = df['lifestyle_score'].fillna(0)
-    else:
-        df['lifestyle_score'] = 0
+    n_rows = len(df)
+    zeros = np.zeros(n_rows)
+    
+    def column(name):
+        return df[name].to_numpy(dtype=np.float64) if name in df.columns else None
+    
+    # Sleep efficiency (0 when time in bed is missing or zero)
+    sleep_eff = column('sleep_efficiency')
+    if sleep_eff is None:
+        duration = column('sleep_duration_minutes')
+        time_in_bed = column('time_in_bed_minutes')
+        if duration is not None and time_in_bed is not None:
+            sleep_eff = np.divide(
+                duration, time_in_bed, out=np.zeros(n_rows), where=time_in_bed > 0
+            )
+            sleep_eff = np.clip(np.nan_to_num(sleep_eff, nan=0.0), 0, 1)
+            df['sleep_efficiency'] = sleep_eff
+    
+    # High intensity minutes
+    high_intensity = None
+    very_active = column('very_active_minutes')
+    moderately_active = column('moderately_active_minutes')
+    if very_active is not None and moderately_active is not None:
+        high_intensity = very_active + moderately_active * 0.5
+        df['high_intensity_minutes'] = high_intensity
+    
+    # Lifestyle score; unavailable inputs get a zero weight and zero-filled array
+    inputs = {
+        'steps': column('steps'),
+        'sleep_efficiency': sleep_eff,
+        'high_intensity_minutes': high_intensity,
+        'avg_resting_hr': column('avg_resting_hr')
+    }
+    weights = np.array([
+        0.0 if inputs[col] is None else weight
+        for col, weight in LIFESTYLE_WEIGHTS.items()
+    ])
+    arrays = [zeros if inputs[col] is None else inputs[col] for col in LIFESTYLE_WEIGHTS]
+    
+    score = np.empty(n_rows)
+    _lifestyle_kernel(*arrays, weights, score)
+    df['lifestyle_score'] = score
     
     return df
 
@@ -98,14 +133,8 @@ def create_daily_features(df):
     Returns:
         pd.DataFrame: DataFrame with daily features
     """
-    # Calculate sleep efficiency
-    df = calculate_sleep_efficiency(df)
-    
-    # Calculate high intensity minutes
-    df = calculate_high_intensity_minutes(df)
-    
-    # Calculate lifestyle score
-    df = calculate_lifestyle_score(df)
+    # Derive sleep efficiency, high intensity minutes and lifestyle score
+    df = compute_daily_derived(df)
     
     return df
 
@@ -120,32 +149,31 @@ def create_user_features(df):
     Returns:
         pd.DataFrame: DataFrame with user-level features
     """
-    # Group by user and calculate averages
-    user_features = df.groupby('user_id').agg({
-        'steps': 'mean',
-        'sedentary_minutes': 'mean',
-        'calories_burned': 'mean',
-        'sleep_efficiency': 'mean',
-        'time_in_bed_minutes': 'mean',
-        'avg_resting_hr': 'mean',
-        'high_intensity_minutes': 'mean',
-        'lifestyle_score': 'mean'
-    }).reset_index()
-    
-    # Rename columns for clarity
-    user_features.columns = [
-        'user_id',
-        'avg_steps',
-        'avg_sedentary_minutes',
-        'avg_calories_burned',
-        'avg_sleep_efficiency',
-        'avg_time_in_bed',
-        'avg_resting_hr',
-        'avg_high_intensity_minutes',
-        'avg_lifestyle_score'
-    ]
+    user_ids = df['user_id']
+    if not isinstance(user_ids.dtype, pd.CategoricalDtype):
+        user_ids = user_ids.astype('category')
+    
+    # Sort rows by user code once; each user is then a contiguous segment
+    codes = user_ids.cat.codes.to_numpy()
+    order = np.argsort(codes, kind='stable')
+    order = order[codes[order] >= 0]  # drop rows with a missing user_id
+    sorted_codes = codes[order]
+    edges = np.flatnonzero(np.diff(sorted_codes, prepend=-1))
+    
+    user_features = {
+        'user_id': pd.Categorical.from_codes(sorted_codes[edges], dtype=user_ids.dtype)
+    }
+    
+    # Per-user means, skipping NaNs like groupby().mean()
+    for col, feature in USER_FEATURE_COLUMNS.items():
+        values = df[col].to_numpy(dtype=np.float64)[order]
+        present = ~np.isnan(values)
+        sums = np.add.reduceat(np.where(present, values, 0.0), edges)
+        counts = np.add.reduceat(present.astype(np.int64), edges)
+        with np.errstate(invalid='ignore'):
+            user_features[feature] = sums / counts
     
-    return user_features
+    return pd.DataFrame(user_features)
 
 
 def feature_engineering_pipeline(df):
@@ -162,8 +190,8 @@ def feature_engineering_pipeline(df):
     print("FEATURE ENGINEERING PIPELINE")
     print("=" * 50)
     
-    # Create daily features
-    daily_df = create_daily_features(df.copy())
+    # Create daily features on a shallow copy so the caller's frame keeps its columns
+    daily_df = create_daily_features(df.copy(deep=False))
     print(f"Created daily features: {len(daily_df)} records")
     
     # Create user-level features
@@ -9,12 +9,76 @@ import numpy as np
 from pathlib import Path
 
 
+# Columns read from each dataset; other raw columns are not used downstream
+DATASET_COLUMNS = {
+    'activity': [
+        'user_id', 'date', 'steps', 'sedentary_minutes', 'calories_burned',
+        'very_active_minutes', 'moderately_active_minutes'
+    ],
+    'sleep': [
+        'user_id', 'date', 'time_in_bed_minutes', 'sleep_duration_minutes',
+        'sleep_efficiency'
+    ],
+    'heart_rate': ['user_id', 'date', 'avg_resting_hr']
+}
+
+# Integer columns that can exceed the int16 range
+WIDE_INT_COLUMNS = {'steps', 'calories_burned'}
+
+
+def dataset_path(data_path, name):
+    """
+    Resolve the file a dataset is read from, preferring Parquet over CSV.
+    
+    Args:
+        data_path (Path): Directory containing the data files
+        name (str): Dataset name (key of DATASET_COLUMNS)
+        
+    Returns:
+        Path: Path to the Parquet file if it exists, else the CSV file
+    """
+    parquet_file = Path(data_path) / f'{name}.parquet'
+    if parquet_file.exists():
+        return parquet_file
+    return Path(data_path) / f'{name}.csv'
+
+
+def read_dataset(data_path, name):
+    """
+    Read a single dataset, preferring Parquet over CSV.
+    
+    Args:
+        data_path (Path): Directory containing the data files
+        name (str): Dataset name (key of DATASET_COLUMNS)
+        
+    Returns:
+        pd.DataFrame: Loaded dataframe
+    """
+    path = dataset_path(data_path, name)
+    if path.suffix == '.parquet':
+        return pd.read_parquet(
+            path,
+            engine='pyarrow',
+            columns=DATASET_COLUMNS[name]
+        )
+    
+    # Fall back to CSV when no Parquet file has been generated; the pyarrow
+    # reader is multithreaded and yields typed, dictionary-encoded columns
+    return pd.read_csv(
+        path,
+        engine='pyarrow',
+        usecols=DATASET_COLUMNS[name],
+        dtype={'user_id': 'category'},
+        parse_dates=['date']
+    )
+
+
 def load_datasets(data_dir='data'):
     """
-    Load all Fitbit datasets from CSV files.
+    Load all Fitbit datasets from Parquet (or CSV) files.
     
     Args:
-        data_dir (str): Directory containing CSV files
+        data_dir (str): Directory containing data files
         
     Returns:
         tuple: (activity_df, sleep_df, heart_rate_df)
@@ -22,9 +86,18 @@ def load_datasets(data_dir='data'):
     data_path = Path(data_dir)
     
     # Load datasets
-    activity_df = pd.read_csv(data_path / 'activity.csv')
-    sleep_df = pd.read_csv(data_path / 'sleep.csv')
-    heart_rate_df = pd.read_csv(data_path / 'heart_rate.csv')
+    activity_df = read_dataset(data_path, 'activity')
+    sleep_df = read_dataset(data_path, 'sleep')
+    heart_rate_df = read_dataset(data_path, 'heart_rate')
+    
+    # Share one categorical dtype for user_id so groupby/merge use integer codes;
+    # missing user_ids stay missing (code -1) rather than becoming a category
+    all_users = pd.concat([
+        df['user_id'] for df in (activity_df, sleep_df, heart_rate_df)
+    ]).dropna().unique()
+    user_dtype = pd.CategoricalDtype(categories=sorted(all_users))
+    for df in (activity_df, sleep_df, heart_rate_df):
+        df['user_id'] = df['user_id'].astype(user_dtype)
     
     print(f"Loaded {len(activity_df)} activity records")
     print(f"Loaded {len(sleep_df)} sleep records")
@@ -50,14 +123,43 @@ def clean_data(df, dataset_name=''):
     df = df.drop_duplicates()
     print(f"{dataset_name}: Removed {initial_rows - len(df)} duplicate rows")
     
-    # Handle null values
-    null_counts = df.isnull().sum()
-    if null_counts.sum() > 0:
+    # Handle null values in numeric columns (single scan when there are none)
+    numeric_values = df.select_dtypes(include=[np.number]).to_numpy(dtype=np.float64)
+    if np.isnan(numeric_values).any():
+        null_counts = df.isnull().sum()
         print(f"{dataset_name}: Null values found:")
         print(null_counts[null_counts > 0])
         # Fill numeric columns with median
-        numeric_cols = df.select_dtypes(include=[np.number]).columns
-        df[numeric_cols] = df[numeric_cols].fillna(df[numeric_cols].median())
+        df.fillna(df.median(numeric_only=True), inplace=True)
+    
+    # Store counts and minutes in narrower types
+    df = downcast_numeric(df)
+    
+    return df
+
+
+def downcast_numeric(df):
+    """
+    Downcast numeric columns to the narrowest types used by the pipeline.
+    
+    Step and calorie counts become int32, other integer columns (minutes,
+    heart rate) int16 and float columns float32. Integer columns whose
+    values do not fit the target type are left unchanged.
+    
+    Args:
+        df (pd.DataFrame): Input dataframe
+        
+    Returns:
+        pd.DataFrame: Dataframe with downcast numeric columns
+    """
+    for col in df.select_dtypes(include=['integer']).columns:
+        target = np.int32 if col in WIDE_INT_COLUMNS else np.int16
+        limits = np.iinfo(target)
+        if df[col].between(limits.min, limits.max).all():
+            df[col] = df[col].astype(target)
+    
+    float_cols = df.select_dtypes(include=['floating']).columns
+    df[float_cols] = df[float_cols].astype(np.float32)
     
     return df
 
@@ -78,6 +180,26 @@ def aggregate_daily_metrics(df, group_cols, agg_dict):
     return aggregated
 
 
+def prepare_dataset(df, dataset_name=''):
+    """
+    Clean a dataset and make sure its date column is datetime.
+    
+    Args:
+        df (pd.DataFrame): Input dataframe
+        dataset_name (str): Name of dataset for logging
+        
+    Returns:
+        pd.DataFrame: Cleaned dataframe with parsed dates
+    """
+    df = clean_data(df, dataset_name)
+    
+    # Parquet and pyarrow CSV inputs are already parsed
+    if 'date' in df.columns and not pd.api.types.is_datetime64_any_dtype(df['date']):
+        df['date'] = pd.to_datetime(df['date'], format='%Y-%m-%d', cache=True)
+    
+    return df
+
+
 def merge_datasets(activity_df, sleep_df, heart_rate_df):
     """
     Merge all datasets on user_id and date.
@@ -90,34 +212,23 @@ def merge_datasets(activity_df, sleep_df, heart_rate_df):
     Returns:
         pd.DataFrame: Merged dataframe
     """
-    # Clean each dataset
-    activity_df = clean_data(activity_df, 'Activity')
-    sleep_df = clean_data(sleep_df, 'Sleep')
-    heart_rate_df = clean_data(heart_rate_df, 'Heart Rate')
-    
-    # Ensure date columns are datetime
-    for df in [activity_df, sleep_df, heart_rate_df]:
-        if 'date' in df.columns:
-            df['date'] = pd.to_datetime(df['date'])
-    
-    # Merge step by step
-    merged_df = activity_df.merge(
-        sleep_df,
-        on=['user_id', 'date'],
-        how='outer'
-    )
+    # Clean each dataset and parse its dates
+    activity_df = prepare_dataset(activity_df, 'Activity')
+    sleep_df = prepare_dataset(sleep_df, 'Sleep')
+    heart_rate_df = prepare_dataset(heart_rate_df, 'Heart Rate')
     
-    merged_df = merged_df.merge(
-        heart_rate_df,
-        on=['user_id', 'date'],
-        how='outer'
-    )
+    # Align all datasets on (user_id, date) in a single concatenation
+    indexed = [
+        df.set_index(['user_id', 'date'])
+        for df in (activity_df, sleep_df, heart_rate_df)
+    ]
+    merged_df = pd.concat(indexed, axis=1).reset_index()
     
-    # Fill missing values after merge
-    numeric_cols = merged_df.select_dtypes(include=[np.number]).columns
-    merged_df[numeric_cols] = merged_df[numeric_cols].fillna(
-        merged_df[numeric_cols].median()
-    )
+    # Fill keys missing from a dataset with that dataset's medians; each
+    # frame's medians are computed once, and only when there are gaps
+    if merged_df.isna().to_numpy().any():
+        medians = pd.concat([df.median(numeric_only=True) for df in indexed])
+        merged_df.fillna(medians, inplace=True)
     
     print(f"Merged dataset: {len(merged_df)} records")
     print(f"Merged dataset columns: {list(merged_df.columns)}")
@@ -130,8 +241,8 @@ def preprocess_pipeline(data_dir='data', output_path=None):
     Complete preprocessing pipeline.
     
     Args:
-        data_dir (str): Directory containing CSV files
-        output_path (str, optional): Path to save merged dataset
+        data_dir (str): Directory containing data files
+        output_path (str, optional): Path to save merged dataset (.parquet or .csv)
         
     Returns:
         pd.DataFrame: Preprocessed and merged dataframe
@@ -148,7 +259,10 @@ def preprocess_pipeline(data_dir='data', output_path=None):
     
     # Save if output path provided
     if output_path:
-        merged_df.to_csv(output_path, index=False)
+        if Path(output_path).suffix == '.parquet':
+            merged_df.to_parquet(output_path, engine='pyarrow', index=False)
+        else:
+            merged_df.to_csv(output_path, index=False)
         print(f"\nMerged dataset saved to {output_path}")
     
     return merged_df
@@ -156,6 +270,6 @@ def preprocess_pipeline(data_dir='data', output_path=None):
 
 if __name__ == '__main__':
     # Run preprocessing pipeline
-    df = preprocess_pipeline(data_dir='data', output_path='data/merged_data.csv')
+    df = preprocess_pipeline(data_dir='data', output_path='data/merged_data.parquet')
     print("\n✅ Preprocessing complete!")
 
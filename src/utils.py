@@ -9,6 +9,12 @@ import numpy as np
 from pathlib import Path
 import json
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 
 def load_config(config_path='config.json'):
     """
@@ -34,6 +40,17 @@ def load_config(config_path='config.json'):
         }
 
 
+def _json_default(obj):
+    """Convert NumPy types that the json module cannot serialize."""
+    if isinstance(obj, np.integer):
+        return int(obj)
+    elif isinstance(obj, np.floating):
+        return float(obj)
+    elif isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
 def save_results(results_dict, output_path):
     """
     Save analysis results to JSON file.
@@ -45,24 +62,17 @@ def save_results(results_dict, output_path):
     output_file = Path(output_path)
     output_file.parent.mkdir(parents=True, exist_ok=True)
     
-    # Convert numpy types to native Python types for JSON serialization
-    def convert_numpy_types(obj):
-        if isinstance(obj, np.integer):
-            return int(obj)
-        elif isinstance(obj, np.floating):
-            return float(obj)
-        elif isinstance(obj, np.ndarray):
-            return obj.tolist()
-        elif isinstance(obj, dict):
-            return {key: convert_numpy_types(value) for key, value in obj.items()}
-        elif isinstance(obj, list):
-            return [convert_numpy_types(item) for item in obj]
-        return obj
-    
-    results_serializable = convert_numpy_types(results_dict)
-    
-    with open(output_file, 'w') as f:
-        json.dump(results_serializable, f, indent=2)
+    if ORJSON_AVAILABLE:
+        # orjson serializes NumPy scalars and C-contiguous arrays natively;
+        # other arrays, object arrays and float16 fall back to _json_default
+        output_file.write_bytes(orjson.dumps(
+            results_dict,
+            default=_json_default,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+        ))
+    else:
+        with open(output_file, 'w') as f:
+            json.dump(results_dict, f, indent=2, default=_json_default)
     
     print(f"Results saved to {output_path}")
 
@@ -118,21 +128,23 @@ def format_number(num, decimals=2):
     return f"{num:.{decimals}f}"
 
 
-def get_data_info(df):
+def get_data_info(df, deep=False):
     """
     Get basic information about dataframe.
     
     Args:
         df (pd.DataFrame): Input dataframe
+        deep (bool): Measure the true size of object columns (slow for strings)
         
     Returns:
-        dict: Dictionary with data info
+        dict: Dictionary with data info (null_counts lists only columns with nulls)
     """
+    null_counts = df.isna().sum()
     return {
         'shape': df.shape,
         'columns': list(df.columns),
-        'memory_usage_mb': df.memory_usage(deep=True).sum() / 1024**2,
-        'null_counts': df.isnull().sum().to_dict(),
+        'memory_usage_mb': df.memory_usage(deep=deep).sum() / 1024**2,
+        'null_counts': {col: int(count) for col, count in null_counts.items() if count > 0},
         'dtypes': df.dtypes.astype(str).to_dict()
     }
 
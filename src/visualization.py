@@ -4,10 +4,17 @@ Data Visualization Module
 This module creates various visualizations for the Fitbit analysis.
 """
 
-import pandas as pd
+import io
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
 import numpy as np
+import matplotlib
 import matplotlib.pyplot as plt
+from matplotlib.colors import ListedColormap
 import seaborn as sns
+from seaborn.utils import relative_luminance
+from scipy.stats import gaussian_kde
 from sklearn.decomposition import PCA
 import warnings
 warnings.filterwarnings('ignore')
@@ -16,6 +23,19 @@ warnings.filterwarnings('ignore')
 sns.set_style("whitegrid")
 plt.rcParams['figure.figsize'] = (12, 8)
 
+# Skip the KDE overlay above this many points; a histogram is enough there
+KDE_MAX_POINTS = 50000
+KDE_GRID_POINTS = 200
+
+# Distribution plots use at most this many daily rows (random sample beyond)
+DISTRIBUTION_SAMPLE_ROWS = 200_000
+
+# Largest correlation matrix that still gets per-cell value labels
+HEATMAP_ANNOTATE_MAX = 20
+
+# Faster PNG encoding for flat-colour plots at a small file-size cost
+PNG_SAVE_KWARGS = {'compress_level': 3, 'optimize': False}
+
 
 def plot_distribution(df, column, title=None, ax=None):
     """
@@ -30,7 +50,21 @@ def plot_distribution(df, column, title=None, ax=None):
     if ax is None:
         fig, ax = plt.subplots(figsize=(10, 6))
     
-    sns.histplot(data=df, x=column, kde=True, ax=ax)
+    values = df[column].to_numpy(dtype=np.float64)
+    values = values[~np.isnan(values)]
+    
+    # Pre-binned histogram
+    color = sns.color_palette()[0]
+    counts, edges = np.histogram(values, bins='auto')
+    ax.bar(edges[:-1], counts, width=np.diff(edges), align='edge',
+           color=color, alpha=0.6, edgecolor='white')
+    
+    # KDE evaluated on a coarse grid, scaled to histogram counts
+    if 1 < len(values) < KDE_MAX_POINTS and np.ptp(values) > 0:
+        grid = np.linspace(values.min(), values.max(), KDE_GRID_POINTS)
+        density = gaussian_kde(values)(grid)
+        ax.plot(grid, density * len(values) * (edges[1] - edges[0]), color=color, linewidth=2)
+    
     ax.set_title(title or f'Distribution of {column}', fontsize=14, fontweight='bold')
     ax.set_xlabel(column.replace('_', ' ').title(), fontsize=12)
     ax.set_ylabel('Frequency', fontsize=12)
@@ -38,7 +72,7 @@ def plot_distribution(df, column, title=None, ax=None):
     return ax
 
 
-def plot_multiple_distributions(df, columns, n_cols=3):
+def plot_multiple_distributions(df, columns, n_cols=3, subplot_spec=None):
     """
     Plot multiple distributions in a grid.
     
@@ -46,28 +80,34 @@ def plot_multiple_distributions(df, columns, n_cols=3):
         df (pd.DataFrame): Input dataframe
         columns (list): List of column names
         n_cols (int): Number of columns in grid
+        subplot_spec (SubplotSpec): Region of an existing figure to draw the
+            grid in (None = new figure)
     """
     n_rows = int(np.ceil(len(columns) / n_cols))
-    fig, axes = plt.subplots(n_rows, n_cols, figsize=(15, 5 * n_rows))
-    axes = axes.flatten() if n_rows > 1 else [axes] if n_cols == 1 else axes
+    if subplot_spec is None:
+        fig, axes = plt.subplots(n_rows, n_cols, figsize=(15, 5 * n_rows), squeeze=False)
+    else:
+        fig = subplot_spec.get_gridspec().figure
+        axes = subplot_spec.subgridspec(n_rows, n_cols).subplots(squeeze=False)
     
-    for idx, col in enumerate(columns):
+    for ax, col in zip(axes.flat, columns):
         if col in df.columns:
-            plot_distribution(df, col, title=f'Distribution of {col}', ax=axes[idx])
+            plot_distribution(df, col, title=f'Distribution of {col}', ax=ax)
         else:
-            axes[idx].text(0.5, 0.5, f'{col} not found', 
-                          ha='center', va='center', transform=axes[idx].transAxes)
-            axes[idx].set_title(f'{col} (not available)')
+            ax.text(0.5, 0.5, f'{col} not found', 
+                    ha='center', va='center', transform=ax.transAxes)
+            ax.set_title(f'{col} (not available)')
     
     # Hide unused subplots
-    for idx in range(len(columns), len(axes)):
-        axes[idx].set_visible(False)
+    for ax in axes.flat[len(columns):]:
+        ax.set_visible(False)
     
-    plt.tight_layout()
+    if subplot_spec is None:
+        plt.tight_layout()
     return fig
 
 
-def plot_correlation_heatmap(df, columns=None, title='Correlation Heatmap'):
+def plot_correlation_heatmap(df, columns=None, title='Correlation Heatmap', ax=None):
     """
     Plot correlation heatmap for numerical columns.
     
@@ -75,25 +115,56 @@ def plot_correlation_heatmap(df, columns=None, title='Correlation Heatmap'):
         df (pd.DataFrame): Input dataframe
         columns (list): Columns to include (None = all numerical)
         title (str): Plot title
+        ax (matplotlib.axes): Axes object (None = new figure)
     """
     if columns is None:
-        numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
-        columns = [col for col in numeric_cols if df[col].notna().sum() > 0]
+        numeric = df.select_dtypes(include=[np.number])
+        columns = numeric.columns[numeric.notna().any(axis=0).to_numpy()].tolist()
     
-    # Calculate correlation
-    corr_matrix = df[columns].corr()
+    # Calculate correlation; NaN-free data goes through a single BLAS product
+    values = df[columns].to_numpy(dtype=np.float32)
+    if np.isnan(values).any():
+        corr = df[columns].corr().to_numpy(dtype=np.float32)
+    else:
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = np.corrcoef(values, rowvar=False, dtype=np.float32)
     
     # Create heatmap
-    fig, ax = plt.subplots(figsize=(12, 10))
-    sns.heatmap(corr_matrix, annot=True, fmt='.2f', cmap='coolwarm', 
-                center=0, square=True, linewidths=1, cbar_kws={"shrink": 0.8}, ax=ax)
+    own_figure = ax is None
+    if own_figure:
+        fig, ax = plt.subplots(figsize=(12, 10))
+    im = ax.imshow(corr, cmap='coolwarm', vmin=-1, vmax=1, aspect='equal')
+    ax.figure.colorbar(im, ax=ax, shrink=0.8)
+    
+    n_cols = len(columns)
+    ax.set_xticks(np.arange(n_cols))
+    ax.set_xticklabels(columns, rotation=45, ha='right')
+    ax.set_yticks(np.arange(n_cols))
+    ax.set_yticklabels(columns)
+    
+    # White cell borders instead of the style's background grid
+    ax.grid(False)
+    ax.set_xticks(np.arange(n_cols + 1) - 0.5, minor=True)
+    ax.set_yticks(np.arange(n_cols + 1) - 0.5, minor=True)
+    ax.grid(which='minor', color='white', linewidth=1)
+    ax.tick_params(which='both', length=0)
+    
+    # Annotate cells only while the labels stay readable
+    if n_cols <= HEATMAP_ANNOTATE_MAX:
+        cell_colors = im.cmap(im.norm(corr))
+        for (i, j), value in np.ndenumerate(corr):
+            if not np.isnan(value):
+                text_color = 'black' if relative_luminance(cell_colors[i, j]) > 0.408 else 'white'
+                ax.text(j, i, f'{value:.2f}', ha='center', va='center', color=text_color)
+    
     ax.set_title(title, fontsize=16, fontweight='bold', pad=20)
-    plt.tight_layout()
+    if own_figure:
+        plt.tight_layout()
     
-    return fig
+    return ax.figure
 
 
-def plot_cluster_pca(user_features_df, cluster_labels, feature_names, n_components=2):
+def plot_cluster_pca(user_features_df, cluster_labels, feature_names, n_components=2, ax=None):
     """
     Plot clusters using PCA for dimensionality reduction.
     
@@ -102,82 +173,71 @@ def plot_cluster_pca(user_features_df, cluster_labels, feature_names, n_componen
         cluster_labels (np.array): Cluster assignments
         feature_names (list): Feature names used
         n_components (int): Number of PCA components
+        ax (matplotlib.axes): Axes object (None = new figure)
     """
-    # Prepare data
-    X = user_features_df[feature_names].values
+    # Prepare data as a C-contiguous float64 array so PCA does not re-copy it
+    X = np.ascontiguousarray(
+        user_features_df[feature_names].to_numpy(dtype=np.float64, copy=False)
+    )
     
-    # Perform PCA
-    pca = PCA(n_components=n_components, random_state=42)
+    # Perform PCA; randomized SVD only computes the leading components
+    pca = PCA(n_components=n_components, svd_solver='randomized',
+              iterated_power=4, random_state=42)
     X_pca = pca.fit_transform(X)
     
-    # Create dataframe for plotting
-    pca_df = pd.DataFrame(X_pca, columns=[f'PC{i+1}' for i in range(n_components)])
-    pca_df['cluster'] = cluster_labels
-    pca_df['user_id'] = user_features_df['user_id'].values
-    
     # Plot
-    fig, ax = plt.subplots(figsize=(12, 8))
+    own_figure = ax is None
+    if own_figure:
+        fig, ax = plt.subplots(figsize=(12, 8))
     
-    # Get unique clusters and colors
-    unique_clusters = sorted(pca_df['cluster'].unique())
-    colors = sns.color_palette("husl", len(unique_clusters))
-    
-    for cluster_id, color in zip(unique_clusters, colors):
-        cluster_data = pca_df[pca_df['cluster'] == cluster_id]
-        ax.scatter(cluster_data['PC1'], cluster_data['PC2'], 
-                  label=f'Cluster {cluster_id}', color=color, s=100, alpha=0.7)
+    # Map cluster ids to palette indices and draw all points in one call
+    unique_clusters, cluster_codes = np.unique(cluster_labels, return_inverse=True)
+    cmap = ListedColormap(sns.color_palette("husl", len(unique_clusters)))
+    scatter = ax.scatter(X_pca[:, 0], X_pca[:, 1], c=cluster_codes, cmap=cmap,
+                         vmin=-0.5, vmax=len(unique_clusters) - 0.5, s=100, alpha=0.7)
     
     ax.set_xlabel(f'Principal Component 1 ({pca.explained_variance_ratio_[0]:.1%} variance)', 
                  fontsize=12)
     ax.set_ylabel(f'Principal Component 2 ({pca.explained_variance_ratio_[1]:.1%} variance)', 
                  fontsize=12)
     ax.set_title('User Clusters Visualization (PCA)', fontsize=16, fontweight='bold')
-    ax.legend(title='Clusters', fontsize=10)
+    ax.legend(handles=scatter.legend_elements(num=None)[0],
+              labels=[f'Cluster {cluster_id}' for cluster_id in unique_clusters],
+              title='Clusters', fontsize=10)
     ax.grid(True, alpha=0.3)
-    plt.tight_layout()
+    if own_figure:
+        plt.tight_layout()
     
-    return fig, pca
+    return ax.figure, pca
 
 
-def plot_cluster_profiles(cluster_profiles_df, feature_names):
+def plot_cluster_profiles(cluster_profiles_df, feature_names, ax=None):
     """
     Plot cluster profile comparison.
     
     Args:
         cluster_profiles_df (pd.DataFrame): Cluster profile summary
         feature_names (list): Feature names to plot
+        ax (matplotlib.axes): Axes object (None = new figure)
     """
-    # Prepare data for plotting
-    plot_data = []
-    for _, row in cluster_profiles_df.iterrows():
-        for feature in feature_names:
-            col_name = f'avg_{feature}'
-            if col_name in row.index:
-                plot_data.append({
-                    'cluster': row['cluster'],
-                    'feature': feature,
-                    'value': row[col_name]
-                })
-    
-    plot_df = pd.DataFrame(plot_data)
+    # Gather a (clusters x features) matrix of profile values in one step
+    profile_cols = [f'avg_{feature}' for feature in feature_names]
+    profiles = cluster_profiles_df.set_index('cluster').sort_index()
+    values = profiles.reindex(columns=profile_cols, fill_value=0).to_numpy()
+    clusters = profiles.index.to_numpy()
     
     # Create grouped bar plot
-    fig, ax = plt.subplots(figsize=(14, 8))
+    own_figure = ax is None
+    if own_figure:
+        fig, ax = plt.subplots(figsize=(14, 8))
     
     x = np.arange(len(feature_names))
     width = 0.25
-    clusters = sorted(plot_df['cluster'].unique())
     colors = sns.color_palette("Set2", len(clusters))
     
-    for i, cluster_id in enumerate(clusters):
-        cluster_values = [
-            plot_df[(plot_df['cluster'] == cluster_id) & (plot_df['feature'] == feat)]['value'].iloc[0]
-            if len(plot_df[(plot_df['cluster'] == cluster_id) & (plot_df['feature'] == feat)]) > 0
-            else 0
-            for feat in feature_names
-        ]
+    for i, (cluster_id, color, cluster_values) in enumerate(zip(clusters, colors, values)):
         ax.bar(x + i * width, cluster_values, width, 
-               label=f'Cluster {cluster_id}', color=colors[i], alpha=0.8)
+               label=f'Cluster {cluster_id}', color=color, alpha=0.8)
     
     ax.set_xlabel('Features', fontsize=12)
     ax.set_ylabel('Average Value', fontsize=12)
@@ -187,16 +247,93 @@ def plot_cluster_profiles(cluster_profiles_df, feature_names):
                        rotation=45, ha='right')
     ax.legend(title='Clusters', fontsize=10)
     ax.grid(True, alpha=0.3, axis='y')
-    plt.tight_layout()
+    if own_figure:
+        plt.tight_layout()
+    
+    return ax.figure
+
+
+def plot_overview(daily_df, user_features_df, cluster_labels, cluster_profiles_df,
+                  feature_names, dist_columns, heatmap_columns):
+    """
+    Plot all four report panels on a single figure sharing one GridSpec.
+    
+    Args:
+        daily_df (pd.DataFrame): Daily features dataframe
+        user_features_df (pd.DataFrame): User features dataframe
+        cluster_labels (np.array): Cluster assignments
+        cluster_profiles_df (pd.DataFrame): Cluster profile summary
+        feature_names (list): Feature names used for clustering
+        dist_columns (list): Daily columns for the distribution panel
+        heatmap_columns (list): Daily columns for the correlation panel
+    """
+    fig = plt.figure(figsize=(24, 16), layout='constrained')
+    gs = fig.add_gridspec(2, 2)
+    
+    if dist_columns:
+        plot_multiple_distributions(daily_df, dist_columns, n_cols=len(dist_columns),
+                                    subplot_spec=gs[0, 0])
+    if heatmap_columns:
+        plot_correlation_heatmap(daily_df, heatmap_columns, ax=fig.add_subplot(gs[0, 1]))
+    plot_cluster_pca(user_features_df, cluster_labels, feature_names, ax=fig.add_subplot(gs[1, 0]))
+    plot_cluster_profiles(cluster_profiles_df, feature_names, ax=fig.add_subplot(gs[1, 1]))
     
     return fig
 
 
+def _init_worker():
+    """Use the non-interactive Agg backend in figure worker processes."""
+    matplotlib.use('Agg')
+
+
+def _save_figure(fig, path, dpi):
+    """Save a figure to path and close it so its pixel buffer can be freed."""
+    # Encode in memory, then write the PNG in a single call
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format='png', dpi=dpi, bbox_inches='tight', pil_kwargs=PNG_SAVE_KWARGS)
+    plt.close(fig)
+    Path(path).write_bytes(buffer.getvalue())
+
+
+def _save_distributions(daily_df, columns, path, dpi):
+    """Render and save the daily distribution grid."""
+    _save_figure(plot_multiple_distributions(daily_df, columns), path, dpi)
+
+
+def _save_heatmap(daily_df, columns, path, dpi):
+    """Render and save the daily correlation heatmap."""
+    _save_figure(plot_correlation_heatmap(daily_df, columns), path, dpi)
+
+
+def _save_cluster_pca(user_features_df, cluster_labels, feature_names, path, dpi):
+    """Render and save the PCA cluster scatter."""
+    fig, _ = plot_cluster_pca(user_features_df, cluster_labels, feature_names)
+    _save_figure(fig, path, dpi)
+
+
+def _save_cluster_profiles(cluster_profiles, feature_names, path, dpi):
+    """Render and save the cluster profile comparison."""
+    _save_figure(plot_cluster_profiles(cluster_profiles, feature_names), path, dpi)
+
+
+def _save_overview(daily_df, user_features_df, cluster_labels, cluster_profiles,
+                   feature_names, dist_columns, heatmap_columns, path, dpi):
+    """Render and save all panels as a single figure."""
+    fig = plot_overview(daily_df, user_features_df, cluster_labels, cluster_profiles,
+                        feature_names, dist_columns, heatmap_columns)
+    _save_figure(fig, path, dpi)
+
+
 def create_all_visualizations(daily_df, user_features_df, cluster_labels, 
-                              cluster_profiles, feature_names, output_dir='reports'):
+                              cluster_profiles, feature_names, output_dir='reports',
+                              max_workers=4, dpi=150, single_figure=False):
     """
     Create all visualizations and save them.
     
+    Each figure is rendered and saved in its own worker process. With
+    single_figure=True all panels are instead drawn on one canvas and saved
+    once as overview.png.
+    
     Args:
         daily_df (pd.DataFrame): Daily features dataframe
         user_features_df (pd.DataFrame): User features dataframe
@@ -204,8 +341,10 @@ def create_all_visualizations(daily_df, user_features_df, cluster_labels,
         cluster_profiles (pd.DataFrame): Cluster profiles
         feature_names (list): Feature names
         output_dir (str): Output directory for plots
+        max_workers (int): Number of figure worker processes
+        dpi (int): Resolution of the saved PNGs (use 300 for print)
+        single_figure (bool): Save one overview.png instead of four files
     """
-    from pathlib import Path
     output_path = Path(output_dir)
     output_path.mkdir(exist_ok=True)
     
@@ -213,42 +352,56 @@ def create_all_visualizations(daily_df, user_features_df, cluster_labels,
     print("CREATING VISUALIZATIONS")
     print("=" * 50)
     
-    # 1. Distribution plots
-    print("Creating distribution plots...")
     dist_cols = ['steps', 'sleep_efficiency', 'avg_resting_hr']
     available_dist_cols = [col for col in dist_cols if col in daily_df.columns]
-    if available_dist_cols:
-        fig = plot_multiple_distributions(daily_df, available_dist_cols)
-        fig.savefig(output_path / 'distributions.png', dpi=300, bbox_inches='tight')
-        plt.close(fig)
-        print("  ✓ Saved distributions.png")
-    
-    # 2. Correlation heatmap
-    print("Creating correlation heatmap...")
     heatmap_cols = [
         'steps', 'calories_burned', 'sleep_efficiency', 
         'avg_resting_hr', 'high_intensity_minutes'
     ]
     available_heatmap_cols = [col for col in heatmap_cols if col in daily_df.columns]
-    if available_heatmap_cols:
-        fig = plot_correlation_heatmap(daily_df, available_heatmap_cols)
-        fig.savefig(output_path / 'correlation_heatmap.png', dpi=300, bbox_inches='tight')
-        plt.close(fig)
-        print("  ✓ Saved correlation_heatmap.png")
-    
-    # 3. Cluster PCA visualization
-    print("Creating cluster PCA visualization...")
-    fig, pca = plot_cluster_pca(user_features_df, cluster_labels, feature_names)
-    fig.savefig(output_path / 'cluster_pca.png', dpi=300, bbox_inches='tight')
-    plt.close(fig)
-    print("  ✓ Saved cluster_pca.png")
     
-    # 4. Cluster profiles
-    print("Creating cluster profile comparison...")
-    fig = plot_cluster_profiles(cluster_profiles, feature_names)
-    fig.savefig(output_path / 'cluster_profiles.png', dpi=300, bbox_inches='tight')
-    plt.close(fig)
-    print("  ✓ Saved cluster_profiles.png")
+    # (description, output file, job, job args); workers only receive the columns they plot
+    jobs = []
+    
+    if single_figure:
+        daily_cols = list(dict.fromkeys(available_dist_cols + available_heatmap_cols))
+        jobs.append(('overview figure', 'overview.png', _save_overview,
+                     (daily_df[daily_cols], user_features_df[feature_names], cluster_labels,
+                      cluster_profiles, feature_names, available_dist_cols, available_heatmap_cols)))
+    else:
+        # 1. Distribution plots
+        if available_dist_cols:
+            dist_df = daily_df[available_dist_cols]
+            if len(dist_df) > DISTRIBUTION_SAMPLE_ROWS:
+                dist_df = dist_df.sample(n=DISTRIBUTION_SAMPLE_ROWS, random_state=0)
+            jobs.append(('distribution plots', 'distributions.png', _save_distributions,
+                         (dist_df, available_dist_cols)))
+        
+        # 2. Correlation heatmap
+        if available_heatmap_cols:
+            jobs.append(('correlation heatmap', 'correlation_heatmap.png', _save_heatmap,
+                         (daily_df[available_heatmap_cols], available_heatmap_cols)))
+        
+        # 3. Cluster PCA visualization
+        jobs.append(('cluster PCA visualization', 'cluster_pca.png', _save_cluster_pca,
+                     (user_features_df[feature_names], cluster_labels, feature_names)))
+        
+        # 4. Cluster profiles
+        jobs.append(('cluster profile comparison', 'cluster_profiles.png', _save_cluster_profiles,
+                     (cluster_profiles, feature_names)))
+    
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker) as executor:
+        futures = []
+        for description, filename, job, args in jobs:
+            print(f"Creating {description}...")
+            futures.append((filename, executor.submit(job, *args, output_path / filename, dpi)))
+        
+        # Drop our references to the job inputs so each is freed once its figure is saved
+        jobs.clear()
+        
+        for filename, future in futures:
+            future.result()
+            print(f"  ✓ Saved {filename}")
     
     print("\n✅ All visualizations created and saved!")
 
@@ -256,17 +409,14 @@ def create_all_visualizations(daily_df, user_features_df, cluster_labels,
 if __name__ == '__main__':
     # Example usage
     import sys
-    from pathlib import Path
     
     sys.path.append(str(Path(__file__).parent.parent))
     
-    from src.preprocess import preprocess_pipeline
-    from src.feature_engineering import feature_engineering_pipeline
+    from main import load_or_build_features
     from src.clustering import clustering_pipeline
     
-    # Run full pipeline
-    df = preprocess_pipeline(data_dir='data')
-    daily_features, user_features = feature_engineering_pipeline(df)
+    # Reuse the cached features from main.py; they are rebuilt only when inputs change
+    daily_features, user_features = load_or_build_features(data_dir='data')
     user_features_clustered, profiles, kmeans, scaler, X_scaled, feature_names = clustering_pipeline(
         user_features, n_clusters=3
     )
@@ -279,4 +429,3 @@ if __name__ == '__main__':
         profiles,
         feature_names
     )
-